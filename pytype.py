@@ -1,22 +1,90 @@
 import abc
-import argparse
 import collections
 import contextlib
+import functools
 import itertools as it
 import math
 import os
 import random
 import string
+import sys
+
+import numpy as np
 
 with contextlib.redirect_stdout(open(os.devnull,'w')):
     import pygame as pg
+    import pygame.freetype
 
 POPSTATE = pg.USEREVENT + 0
 PUSHSTATE = pg.USEREVENT + 1
 
-cooldowns = collections.defaultdict(int)
+# fixed cooldown channels, decremented every frame, indexed by the
+# COOLDOWN_* constants so the hot paths never hash a key
+COOLDOWN_SPAWN = 0
+COOLDOWN_PLAYER_HIT = 1
+scalar_cooldowns = [0, 0]
+# pending Explosion cooldowns, touched only by gameplay code
+explosion_cooldowns = {}
 debugstack = []
 
+# per-(font, color) packed glyph atlases
+_glyph_cache = {}
+
+GLYPH_CHARS = string.digits + string.ascii_letters + string.punctuation + ' '
+
+def glyphs_for(font, color):
+    """
+    Packed glyph atlas for (font, color): every printable glyph
+    rasterized once into a single strip Surface, plus per-char source
+    rects, so text composes as area blits from one source.
+    """
+    key = (id(font), color)
+    page = _glyph_cache.get(key)
+    if page is None:
+        images = [font.render(char, color)[0] for char in GLYPH_CHARS]
+        height = font.get_sized_height()
+        atlas = pg.Surface((sum(image.get_width() for image in images), height),
+                           pg.SRCALPHA)
+        sources = {}
+        x = 0
+        for char, image in zip(GLYPH_CHARS, images):
+            atlas.blit(image, (x, 0))
+            sources[char] = pg.Rect(x, 0, image.get_width(), height)
+            x += image.get_width()
+        page = (atlas.convert_alpha(), sources)
+        _glyph_cache[key] = page
+    return page
+
+@functools.lru_cache(maxsize=4096)
+def render_text(font, text, color):
+    """
+    Memoized text render, composed from pre-rasterized glyphs. Typing
+    shrinks words suffix by suffix, so the same keys recur constantly.
+    """
+    return _compose_text(font, text, color)
+
+def _compose_text(font, text, color):
+    atlas, sources = glyphs_for(font, color)
+    if any(char not in sources for char in text):
+        # not composable from the atlas, rasterize the whole string
+        return font.render(text, color)[0].convert_alpha()
+    rects = [sources[char] for char in text]
+    width = sum(rect.width for rect in rects)
+    surface = pg.Surface((width, font.get_sized_height()),
+                         pg.SRCALPHA).convert_alpha()
+    blits = []
+    x = 0
+    for rect in rects:
+        blits.append((atlas, (x, 0), rect))
+        x += rect.width
+    surface.blits(blits, doreturn=0)
+    return surface
+
+def rotation_atlas(image):
+    "Pre-rotate image to every whole degree."
+    return [pg.transform.rotate(image, angle).convert_alpha()
+            for angle in range(360)]
+
 def abs_angle_to(p1, p2):
     x1, y1 = p1
     x2, y2 = p2
@@ -26,15 +94,22 @@ def abs_angle_to(p1, p2):
 def debug(arg):
     debugstack.append(arg)
 
+_punctuation_table = str.maketrans('', '', string.punctuation)
+
 def haspunctuation(word):
-    return any(letter in string.punctuation for letter in word)
+    # dropping punctuation changes the word only if it had any
+    return word.translate(_punctuation_table) != word
 
 def lerp(a, b, t):
     return a * (1 - t) + b * t
 
 def lerpi(a, b, t):
-    container = type(a)
-    return container(lerp(c, d, t) for c, d in zip(a, b))
+    "Lerp between 2d points in one C call. Clamps t to [0, 1]."
+    if t < 0:
+        t = 0
+    elif t > 1:
+        t = 1
+    return pg.math.Vector2(a).lerp(b, t)
 
 def popstate():
     pg.event.post(pg.event.Event(POPSTATE))
@@ -48,9 +123,10 @@ def quit():
 def random_location(rect, inside, avoiding=None, limit=None):
     rect = rect.copy()
     if limit is None:
-        limit = math.inf
-    count = it.count()
-    while next(count) < limit:
+        trials = it.repeat(None)
+    else:
+        trials = it.repeat(None, limit)
+    for _ in trials:
         rect.center = (random.randint(inside.left, inside.right),
                        random.randint(inside.top, inside.bottom))
         rect.clamp_ip(inside)
@@ -77,12 +153,8 @@ def wrap(rects):
     Return bounding rect of rects.
     :param rects: iterable of pg Rects
     """
-    lefts, tops, rights, bottoms = it.tee(rects, 4)
-    left = min(rect.left for rect in lefts)
-    top = min(rect.top for rect in tops)
-    right = max(rect.right for rect in rights)
-    bottom = max(rect.bottom for rect in bottoms)
-    return pg.Rect(left, top, right - left, bottom - top)
+    rects = list(rects)
+    return rects[0].unionall(rects[1:])
 
 class Clock:
     "Wrap pg Clock to remember what the framerate should be."
@@ -113,12 +185,18 @@ class Screen:
 
 class State:
 
+    # states that repaint only dirty rects set this and return them from draw
+    owns_screen = False
+
     def enter(self):
         "The engine has just switched to this state"
 
     def exit(self):
         "The engine is leaving this state"
 
+    def repaint(self, rect):
+        "A screen region was drawn over externally, redraw it"
+
     @abc.abstractmethod
     def handle(self, event):
         "Handle event"
@@ -159,15 +237,13 @@ class StateManager:
         self.stack.append(state)
         state.enter()
 
-    def update(self):
-        "Handle any state changing events"
-        for event in pg.event.get():
+    def update(self, events):
+        "Handle state changing events"
+        for event in events:
             if event.type == POPSTATE:
                 self.pop()
             elif event.type == PUSHSTATE:
                 self.push(event.state)
-            else:
-                pg.event.post(event)
 
 
 class Engine:
@@ -177,29 +253,53 @@ class Engine:
         self.clock = clock
         self.screen = screen
         self.state_manager = state_manager
+        if debug_renderer is None:
+            debug_renderer = _null_debug_renderer
         self.debug_renderer = debug_renderer
 
     def run(self):
-        while not pg.event.peek(pg.QUIT):
+        while True:
             elapsed = self.clock.tick()
-            self.state_manager.update()
-            if not self.state_manager.current:
-                break
+            # one event pump per frame, split by consumer
+            state_events = []
+            events = []
+            quitting = False
             for event in pg.event.get():
-                self.state_manager.current.handle(event)
+                if event.type == pg.QUIT:
+                    quitting = True
+                elif event.type in (POPSTATE, PUSHSTATE):
+                    state_events.append(event)
+                else:
+                    events.append(event)
+            if quitting:
+                break
+            self.state_manager.update(state_events)
+            current = self.state_manager.current
+            if not current:
+                break
+            for event in events:
+                current.handle(event)
             # update cooldowns
-            for key, value in cooldowns.items():
+            for index, value in enumerate(scalar_cooldowns):
                 if value > 0:
-                    cooldowns[key] -= elapsed
-            self.state_manager.current.update(elapsed)
-            self.screen.clear()
-            self.state_manager.current.draw(self.screen.surf)
-            if self.debug_renderer:
-                self.debug_renderer()
+                    scalar_cooldowns[index] = value - elapsed
+            for key, value in explosion_cooldowns.items():
+                if value > 0:
+                    explosion_cooldowns[key] = value - elapsed
+            current.update(elapsed)
+            debug_rects = self.debug_renderer.take_rects()
+            if not current.owns_screen:
+                self.screen.clear()
+            else:
+                # erase last frame's debug overlay through the state
+                for rect in debug_rects:
+                    current.repaint(rect)
+            dirty = current.draw(self.screen.surf)
+            self.debug_renderer()
+            if dirty is None or self.debug_renderer.forces_flip:
+                self.screen.update()
             else:
-                # empty the debugging stack ourselves
-                debugstack.clear()
-            self.screen.update()
+                pg.display.update(dirty)
 
 
 class Label:
@@ -221,7 +321,7 @@ class LabelSprite(pg.sprite.Sprite):
         super().__init__(*groups)
         self.label = label
         self.font = font
-        self.image = self.font.render(self.label.text, True, (200,200,200))
+        self.image = render_text(self.font, self.label.text, (200,200,200))
         self.rect = self.image.get_rect()
 
 
@@ -231,9 +331,9 @@ class ButtonSprite(pg.sprite.Sprite):
         super().__init__(*groups)
         self.button = button
         self.font = font
-        textimage = self.font.render(self.button.text, True, (200,200,200))
+        textimage = render_text(self.font, self.button.text, (200,200,200))
         textrect = textimage.get_rect().inflate(20,20)
-        self.image = pg.Surface(textrect.size)
+        self.image = pg.Surface(textrect.size).convert()
         self.rect = self.image.get_rect()
         self.image.blit(textimage, textimage.get_rect(center=self.rect.center))
         pg.draw.rect(self.image, (60,60,60), self.rect, 1)
@@ -258,18 +358,29 @@ class MenuState(State):
         for sprite in sprites:
             sprite.rect.x += dx
             sprite.rect.y += dy
+        # layout never changes, cache hit-testing structures once
+        self._buttons = [sprite for sprite in sprites
+                         if isinstance(sprite, ButtonSprite)]
+        self._button_rects = [sprite.rect for sprite in self._buttons]
+        self.hover = None
+        self._composite = None
 
     def do_callback(self, button):
         if button.callback:
             button.callback()
 
     def draw(self, surf):
-        self.sprites.draw(surf)
+        surf.blit(self._composite, self.space.topleft)
         if self.hover:
             pg.draw.rect(surf, (200,10,10), self.hover.rect, 1)
 
     def enter(self):
         pg.mouse.set_visible(True)
+        if self._composite is None:
+            # the menu is static, composite every widget into one surface
+            self._composite = pg.Surface(self.space.size, pg.SRCALPHA).convert_alpha()
+            for sprite in self.sprites:
+                self._composite.blit(sprite.image, sprite.rect)
         self.select_first_button()
 
     def handle(self, event):
@@ -290,35 +401,25 @@ class MenuState(State):
             self.selection(-1)
 
     def on_mousebuttondown(self, event):
-        sprites = (sprite for sprite in self.sprites if isinstance(sprite, ButtonSprite))
-        for sprite in sprites:
-            if sprite.rect.collidepoint(event.pos):
-                self.do_callback(self.hover.button)
-                break
+        index = pg.Rect(event.pos, (1,1)).collidelist(self._button_rects)
+        if index != -1:
+            self.do_callback(self._buttons[index].button)
 
     def on_mousemotion(self, event):
-        sprites = (sprite for sprite in self.sprites if isinstance(sprite, ButtonSprite))
-        for sprite in sprites:
-            if sprite.rect.collidepoint(event.pos):
-                self.hover = sprite
-                break
-        else:
-            self.hover = None
+        index = pg.Rect(event.pos, (1,1)).collidelist(self._button_rects)
+        self.hover = self._buttons[index] if index != -1 else None
 
     def select_first_button(self):
-        for sprite in self.sprites:
-            if isinstance(sprite, ButtonSprite):
-                self.hover = sprite
-                pg.mouse.set_pos(self.hover.rect.center)
-                break
+        if self._buttons:
+            self.hover = self._buttons[0]
+            pg.mouse.set_pos(self.hover.rect.center)
 
     def selection(self, move):
         if not self.hover:
             self.select_first_button()
         if self.hover:
-            sprites = tuple(sprite for sprite in self.sprites if isinstance(sprite, ButtonSprite))
-            index = sprites.index(self.hover)
-            sprite = sprites[(index + move) % len(sprites)]
+            index = self._buttons.index(self.hover)
+            sprite = self._buttons[(index + move) % len(self._buttons)]
             # set_pos fires mouse motion to update hovered button
             pg.mouse.set_pos(sprite.rect.center)
 
@@ -355,6 +456,8 @@ class Wordbag:
     def __init__(self, words):
         self.words = words
         self._sample = None
+        # id(bucket) -> [shuffled order, cursor]
+        self._shuffled = {}
 
     def __bool__(self):
         return bool(self._sample)
@@ -365,29 +468,84 @@ class Wordbag:
     def pop(self):
         return self._sample.pop()
 
-    def randomize(self, k, predicate=None):
-        if predicate is None:
-            predicate = lambda word: True
-        population = set(word for word in self.words if predicate(word))
-        self._sample = random.sample(population, k)
+    def randomize(self, k, words=None):
+        """
+        Take k distinct random words. Each bucket is shuffled once and
+        consumed through a cursor, reshuffling on wrap, instead of
+        paying random.sample's index hashing per wave.
+        """
+        if words is None:
+            words = self.words
+        state = self._shuffled.get(id(words))
+        if state is None:
+            order = list(words)
+            random.shuffle(order)
+            state = self._shuffled[id(words)] = [order, 0]
+        order, cursor = state
+        if cursor + k > len(order):
+            random.shuffle(order)
+            cursor = 0
+        self._sample = order[cursor:cursor + k]
+        state[1] = cursor + k
+
+
+class CachedLayeredGroup(pg.sprite.LayeredDirty):
+    """
+    LayeredDirty keeps its layer order up to date incrementally, but
+    sprites() still copies the whole list on every call. Cache the
+    snapshot and rebuild it only when membership or layering changes.
+    """
+
+    def __init__(self, *sprites, **kwargs):
+        self._drawlist = None
+        super().__init__(*sprites, **kwargs)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self._drawlist = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self._drawlist = None
+
+    def change_layer(self, sprite, new_layer):
+        super().change_layer(sprite, new_layer)
+        self._drawlist = None
+
+    def sprites(self):
+        if self._drawlist is None:
+            self._drawlist = super().sprites()
+        return self._drawlist
 
 
 class Gameplay(State):
 
+    owns_screen = True
+
     def __init__(self, space, spawn_area, wordbag, font, levels, skip_intro=False):
         self.space = space
         self.spawn_area = spawn_area
         self.wordbag = wordbag
         self.font = font
-        # levels: (k population, predicate) indexed by difficulty.
+        # levels: Level records indexed by difficulty.
         self.levels = levels
         self.skip_intro = skip_intro
         self.player = PlayerSprite((space.centerx, 3*space.height/4))
-        self.group = pg.sprite.LayeredUpdates()
+        self.group = CachedLayeredGroup()
+        # work around the flip-threshold heuristic switching back to full flips
+        self.group._use_update = True
+        # typed views of self.group so hot loops skip isinstance scans
+        self.bullets = pg.sprite.Group()
+        self.enemies = pg.sprite.Group()
+        self.texts = pg.sprite.Group()
+        self.sparkfield = SparkField()
+        self._background = None
+        self.healthpips = []
         self.paused = False
         self.updatestack = []
-        self.readysprite = pg.sprite.Sprite()
-        self.readysprite.image = self.font.render('Get Ready', True, (200,200,200))
+        self.readysprite = pg.sprite.DirtySprite()
+        self.readysprite.dirty = 2
+        self.readysprite.image = render_text(self.font, 'Get Ready', (200,200,200))
         self.readysprite.rect = self.readysprite.image.get_rect()
         self.readysprite.time = 0
         self.damage_on_miss = False
@@ -400,9 +558,6 @@ class Gameplay(State):
         # pop self
         popstate()
 
-    def _add_sparks(self, sparks):
-        self.group.add(*sparks)
-
     def check_win_state(self):
         # check for win state
         if len(self.wordbag) == 0 and self.is_win_state():
@@ -422,21 +577,23 @@ class Gameplay(State):
                 self.enter()
 
     def clear_explosions(self):
-        for key in set(cooldowns):
-            if isinstance(key, Explosion):
-                del cooldowns[key]
+        explosion_cooldowns.clear()
+
+    def repaint(self, rect):
+        self.group.repaint_rect(rect)
 
     def draw(self, surf):
-        for sprite in self.group:
-            if isinstance(sprite, TextSprite):
-                rect = sprite.rect.clamp(self.space)
-            else:
-                rect = sprite.rect
-            surf.blit(sprite.image, rect)
-        healthpip = pg.Rect(0, self.space.bottom - 30, 20, 20)
-        for i in range(self.player.health):
-            healthpip.x = 10 + healthpip.width * i * 1.5
-            pg.draw.rect(surf, (200,10,10), healthpip)
+        if self._background is None:
+            self._background = pg.Surface(surf.get_size()).convert()
+            self.group.clear(surf, self._background)
+        # let the group erase last frame's sparks so sprites underneath
+        # are re-queued instead of blanked
+        prev_bound = self.sparkfield.take_bound()
+        if prev_bound is not None:
+            self.group.repaint_rect(prev_bound)
+        dirty = self.group.draw(surf)
+        dirty += self.sparkfield.draw(surf)
+        return dirty
 
     def enter(self):
         pg.mouse.set_visible(False)
@@ -444,6 +601,8 @@ class Gameplay(State):
             # not entering from paused state
             self.reset()
         self.paused = False
+        # whatever state drew before us is still on screen
+        self.group.repaint_rect(self.space)
 
     def exit_intro(self):
         self.group.remove(self.readysprite)
@@ -451,8 +610,7 @@ class Gameplay(State):
 
     def fire(self, letter):
         if not self.locked:
-            for textsprite in (sprite for sprite in self.group
-                               if isinstance(sprite, TextSprite)):
+            for textsprite in self.texts:
                 if textsprite.text and letter == textsprite.text[0]:
                     self.locked = textsprite
                     break
@@ -460,16 +618,19 @@ class Gameplay(State):
                 self.locked = None
         if self.locked:
             if letter == self.locked.text[0]:
-                self.locked.text = self.locked.text[1:]
+                # one image rebuild for all three mutations
+                with self.locked.batch():
+                    self.locked.text = self.locked.text[1:]
+                    self.locked.color = (200, 200, 10)
+                    self.locked.background = (45,45,45,200)
                 # NOTE: self.locked EnemyShipSprite, might have killed itself by now
                 if self.group.has(self.locked):
                     self.group.move_to_front(self.locked)
-                self.locked.color = (200, 200, 10)
-                self.locked.background = (45,45,45,200)
                 # add bullet
                 bulletsprite = BulletSprite(self.locked.enemyshipsprite)
                 bulletsprite.position = self.player.position
                 self.group.add(bulletsprite)
+                self.bullets.add(bulletsprite)
                 if not self.locked.text:
                     self.locked = None
             elif self.damage_on_miss:
@@ -481,11 +642,12 @@ class Gameplay(State):
 
     def hit_player(self):
         self.player.health -= 1
+        self._sync_healthpips()
         if self.player.health == 0:
             self.paused = False
             popstate()
             items = (Label('Game Over'),
-                     Button('Restart', lambda:pushstate(self)),
+                     Button('Restart', functools.partial(pushstate, self)),
                      Button('Exit to desktop', quit))
             deathstate = MenuState(self.space, self.font, items)
             pushstate(deathstate)
@@ -496,15 +658,14 @@ class Gameplay(State):
         cooldown, and no explosions happening--player has won!
         """
         return (not self.wordbag
-                and cooldowns[self.spawn_word] <= 0
-                and not any(True for sprite in self.group
-                            if isinstance(sprite, (TextSprite, Spark))))
+                and scalar_cooldowns[COOLDOWN_SPAWN] <= 0
+                and not self.texts
+                and not self.sparkfield)
 
     def needs_word_spawn(self):
-        ntextsprites = sum(1 for sprite in self.group if isinstance(sprite, TextSprite))
-        return (ntextsprites < self.max_nsprites
+        return (len(self.texts) < self.max_nsprites
                 and self.wordbag
-                and cooldowns[self.spawn_word] <= 0)
+                and scalar_cooldowns[COOLDOWN_SPAWN] <= 0)
 
     def on_keydown(self, event):
         if event.key == pg.K_ESCAPE:
@@ -518,22 +679,21 @@ class Gameplay(State):
         else:
             self.fire(event.unicode)
 
-    def remove_sparks_outofbounds(self):
-        # remove any sparks that are out of bounds
-        for spark in (sprite for sprite in self.group if isinstance(sprite, Spark)):
-            if not self.space.contains(spark.rect):
-                spark.kill()
-
     def reset(self):
         self.group.empty()
+        self.bullets.empty()
+        self.enemies.empty()
+        self.texts.empty()
+        self.sparkfield.clear()
         self.max_nsprites = 3
         self.locked = None
         if self.level > 0:
-            self.readysprite.image = self.font.render(f'Wave {self.level+1}', True, (200,200,200))
+            self.readysprite.image = render_text(self.font, f'Wave {self.level+1}',
+                                                 (200,200,200))
             # place it off screen
             self.readysprite.rect = self.readysprite.image.get_rect(topleft=(-1000,-1000))
-        k, predicate = self.levels[self.level]
-        self.wordbag.randomize(k, predicate)
+        level = self.levels[self.level]
+        self.wordbag.randomize(level.size, level.bucket)
         self.player.reset()
         self.group.add(self.player)
         self.updatestack.clear()
@@ -541,38 +701,64 @@ class Gameplay(State):
         self.updatestack.append(self.update_intro)
         self.readysprite.time = 0
         self.group.add(self.readysprite)
+        for pip in self.healthpips:
+            pip.kill()
+        self.healthpips.clear()
+        self._sync_healthpips()
         if self.skip_intro:
             self.exit_intro()
 
-    def spawn_explosions_from_deaths(self, died):
+    def _sync_healthpips(self):
+        while len(self.healthpips) > self.player.health:
+            self.healthpips.pop().kill()
+        while len(self.healthpips) < self.player.health:
+            self.healthpips.append(
+                HealthPipSprite(len(self.healthpips), self.space.bottom - 10,
+                                self.group))
+
+    def spawn_explosions_from_deaths(self, dead_bullets, dead_enemies):
         # spawn explosions where bullets and enemy ships died
-        for sprite in died:
-            if isinstance(sprite, BulletSprite):
-                explosion = Explosion(sprite.position, 10, (200,)*3, (15,25))
-                self._add_sparks(explosion.sparks)
-            elif isinstance(sprite, EnemyShipSprite):
-                explosion = Explosion(sprite.rect.center, 600, (200,10,10), (5,10))
-                # wait a bit before exploding enemy ship
-                cooldowns[explosion] = 500
+        for sprite in dead_bullets:
+            explosion = Explosion(sprite.position, 10, (200,)*3, (15,25))
+            self.sparkfield.emit(explosion)
+        for sprite in dead_enemies:
+            explosion = Explosion(sprite.rect.center, 600, (200,10,10), (5,10))
+            # wait a bit before exploding enemy ship
+            explosion_cooldowns[explosion] = 500
+
+    def update_sprites(self, elapsed):
+        """
+        Update all sprites and the spark field, returning the bullets and
+        enemies that died as (dead_bullets, dead_enemies). Deaths are
+        detected by diffing the typed groups, kill() drops sprites from
+        them.
+        """
+        bullets = set(self.bullets.sprites())
+        enemies = set(self.enemies.sprites())
+        self.group.update(elapsed)
+        self.sparkfield.update(self.space)
+        return (bullets - set(self.bullets.sprites()),
+                enemies - set(self.enemies.sprites()))
 
     def spawn_explosions_from_cooldowns(self):
-        # add any sparks from an explosion whose cooldown is ready
-        for key, cooldown in cooldowns.items():
-            if (isinstance(key, Explosion)
-                    and not any(sprite for sprite in self.group
-                                if isinstance(key, Explosion) and sprite == key)
-                    and cooldown <= 0):
-                self._add_sparks(key.sparks)
+        # emit sparks from any explosion whose cooldown is ready
+        ready = [explosion for explosion, cooldown in explosion_cooldowns.items()
+                 if cooldown <= 0]
+        for explosion in ready:
+            del explosion_cooldowns[explosion]
+            self.sparkfield.emit(explosion)
 
     def spawn_word(self):
         word = self.wordbag.pop()
         textsprite = TextSprite(word, (200,200,200), self.font, (45,45,45,127))
         textsprite._layer = 10
         self.group.add(textsprite, textsprite.enemyshipsprite)
+        self.texts.add(textsprite)
+        self.enemies.add(textsprite.enemyshipsprite)
         # place the textsprite randomly in the spawn area
         rect = random_location(textsprite.rect, self.spawn_area)
         textsprite.enemyshipsprite.position = rect.center
-        cooldowns[self.spawn_word] = 1000
+        scalar_cooldowns[COOLDOWN_SPAWN] = 1000
 
     def update(self, elapsed):
         self.updatestack[-1](elapsed)
@@ -598,45 +784,55 @@ class Gameplay(State):
     def update_gameplay(self, elapsed):
         if self.needs_word_spawn():
             self.spawn_word()
-        self.remove_sparks_outofbounds()
-        died = set(sprite for sprite in self.group
-                   if isinstance(sprite, (BulletSprite, EnemyShipSprite))
-                   and sprite.alive())
-        self.group.update(elapsed)
-        died = set(sprite for sprite in died if not sprite.alive())
-        self.spawn_explosions_from_deaths(died)
+        dead_bullets, dead_enemies = self.update_sprites(elapsed)
+        self.spawn_explosions_from_deaths(dead_bullets, dead_enemies)
         self.spawn_explosions_from_cooldowns()
-        enemyshipsprites = set(sprite for sprite in self.group
-                               if isinstance(sprite, EnemyShipSprite))
+        enemyshipsprites = self.enemies.sprites()
+        # bind the loop-hot attributes to locals
+        player = self.player
+        space = self.space
 
         if self.locked:
             # point player at enemy
-            angle = abs_angle_to(self.player.position, self.locked.enemyshipsprite.position)
-            self.player.angle = math.degrees(angle)
-
-        if not enemyshipsprites and self.is_win_state():
-            # all enemies dead, wait for animations
-            self.player.angle = 90
-            self.updatestack.pop()
-            self.updatestack.append(self.update_gameplay_wait_for_animations)
+            angle = abs_angle_to(player.position, self.locked.enemyshipsprite.position)
+            player.angle = math.degrees(angle)
+
+        if not enemyshipsprites:
+            if self.is_win_state():
+                # all enemies dead, wait for animations
+                player.angle = 90
+                self.updatestack.pop()
+                self.updatestack.append(self.update_gameplay_wait_for_animations)
         else:
-            # move and point enemy ships at player
-            for enemyshipsprite in enemyshipsprites:
-                x, y = enemyshipsprite.position
-                angle = abs_angle_to((x,y), self.player.position)
-                enemyshipsprite.angle = math.degrees(angle)
-                enemyshipsprite.position = (x + math.cos(angle) * 1, y + math.sin(-angle) * 1)
-                x, y = enemyshipsprite.position
-                enemyshipsprite.textsprite.rect.midtop = (
-                    x, y + enemyshipsprite.textsprite.rect.height / 2)
-                # check player collision
-                if (cooldowns['player-hit'] <= 0
-                        and enemyshipsprite.rect.colliderect(self.player.rect)):
+            # move and point all enemy ships at player in one vector pass
+            xy = np.array([sprite.position for sprite in enemyshipsprites],
+                          np.float32)
+            px, py = player.position
+            angles = (math.tau + np.arctan2(-(py - xy[:,1]), px - xy[:,0])) % math.tau
+            xy[:,0] += np.cos(angles)
+            xy[:,1] += np.sin(-angles)
+            degrees = np.degrees(angles)
+            for enemyshipsprite, position, angle in zip(
+                    enemyshipsprites, xy.tolist(), degrees.tolist()):
+                enemyshipsprite.angle = angle
+                enemyshipsprite.position = position
+                x, y = position
+                textrect = enemyshipsprite.textsprite.rect
+                textrect.midtop = (x, y + textrect.height / 2)
+                textrect.clamp_ip(space)
+            # check player collision against every enemy in one C call
+            if scalar_cooldowns[COOLDOWN_PLAYER_HIT] <= 0:
+                hits = player.rect.collidelistall(
+                    [sprite.rect for sprite in enemyshipsprites])
+                if hits:
+                    # one hit per cooldown window
+                    enemyshipsprite = enemyshipsprites[hits[0]]
                     enemyshipsprite.kill()
                     enemyshipsprite.textsprite.kill()
-                    cooldowns['player-hit'] = 1000
-                    self.player.health -= 1
-                    if self.player.health == 0:
+                    scalar_cooldowns[COOLDOWN_PLAYER_HIT] = 1000
+                    player.health -= 1
+                    self._sync_healthpips()
+                    if player.health == 0:
                         # player died
                         pushstate(
                             MenuState(self.space, self.font,
@@ -644,25 +840,19 @@ class Gameplay(State):
                                        Button('Restart', popstate),
                                        Button('Main menu', self.back_to_mainmenu),
                                        Button('Exit to desktop', quit))))
-                    # no need to check anymore because we've applied the cooldown
-                    break
 
     def update_gameplay_wait_for_animations(self, elapsed):
-        died = set(sprite for sprite in self.group
-                   if isinstance(sprite, (BulletSprite, EnemyShipSprite))
-                   and sprite.alive())
-        self.group.update(elapsed)
-        died = set(sprite for sprite in died if not sprite.alive())
-        self.remove_sparks_outofbounds()
-        self.spawn_explosions_from_deaths(died)
+        dead_bullets, dead_enemies = self.update_sprites(elapsed)
+        self.spawn_explosions_from_deaths(dead_bullets, dead_enemies)
         self.spawn_explosions_from_cooldowns()
         self.check_win_state()
 
 
-class PlayerSprite(pg.sprite.Sprite):
+class PlayerSprite(pg.sprite.DirtySprite):
 
     def __init__(self, position, *groups):
         super().__init__(*groups)
+        self.dirty = 2
         self.position = position
         self.angle = 90
         self._image = pg.Surface((32,)*2,pg.SRCALPHA)
@@ -670,6 +860,8 @@ class PlayerSprite(pg.sprite.Sprite):
         rect = self._image.get_rect()
         points = [rect.midright, rect.bottomleft, rect.topleft]
         pg.draw.polygon(self._image, (10,10,200), points)
+        self._rotations = rotation_atlas(self._image)
+        self._last_angle = None
         self.reset()
 
     def reset(self):
@@ -678,21 +870,28 @@ class PlayerSprite(pg.sprite.Sprite):
         self.update_image()
 
     def update_image(self):
-        self.image = pg.transform.rotate(self._image, self.angle)
+        angle = int(self.angle) % 360
+        if angle != self._last_angle:
+            self._last_angle = angle
+            self.image = self._rotations[angle]
+            # rotated frames outgrow the base image, keep rect bounding
+            self.rect = self.image.get_rect(center=self.rect.center)
 
     def update(self, elapsed):
         self.rect.center = self.position
-        self.image = pg.transform.rotate(self._image, self.angle)
+        self.update_image()
 
 
-class BulletSprite(pg.sprite.Sprite):
+class BulletSprite(pg.sprite.DirtySprite):
 
     def __init__(self, target, *groups):
         super().__init__(*groups)
+        self.dirty = 2
         self.target = target
         self.image = pg.Surface((10,10), pg.SRCALPHA)
         self.rect = self.image.get_rect()
         pg.draw.circle(self.image, (200,10,10,127), self.rect.center, self.rect.width//2)
+        self.image = self.image.convert_alpha()
         self.position = self.rect.center
         self.accumulator = 0
         self.timetolive = 500
@@ -700,7 +899,7 @@ class BulletSprite(pg.sprite.Sprite):
 
     def update(self, elapsed):
         if self.original_position is None:
-            self.original_position = self.position
+            self.original_position = pg.math.Vector2(self.position)
         self.accumulator += elapsed
         self.position = lerpi(self.original_position, self.target.position,
                 (self.accumulator / self.timetolive))
@@ -718,47 +917,111 @@ class BulletSprite(pg.sprite.Sprite):
                 self.target.textsprite.kill()
 
 
-class Spark(pg.sprite.Sprite):
+class SparkField:
+    """
+    Fixed-capacity pool of spark particles held in parallel numpy arrays,
+    advanced with vector math and drawn in one batched blit per frame.
+    """
 
-    __slots__ = ('image', 'rect', 'x', 'y', 'dx', 'dy')
+    def __init__(self, capacity=2048):
+        self.capacity = capacity
+        self.x = np.zeros(capacity, np.float32)
+        self.y = np.zeros(capacity, np.float32)
+        self.dx = np.zeros(capacity, np.float32)
+        self.dy = np.zeros(capacity, np.float32)
+        self.alive = np.zeros(capacity, bool)
+        self.images = [None] * capacity
+        self._image_cache = {}
+        self._prev_bound = None
 
-    def __init__(self, size, position, angle, speed, color, *groups):
-        super().__init__(*groups)
-        self.image = pg.Surface(size, pg.SRCALPHA)
-        self.rect = self.image.get_rect()
-        pg.draw.circle(self.image, color, self.rect.center, min(self.rect.size)//2)
-        self.x, self.y = position
-        self.dx = math.cos(angle) * speed
-        self.dy = math.sin(-angle) * speed
+    def __bool__(self):
+        return bool(self.alive.any())
 
-    def update(self, elapsed):
-        self.x += self.dx
-        self.y += self.dy
-        self.rect.center = (self.x, self.y)
+    def __len__(self):
+        return int(self.alive.sum())
+
+    def _image(self, size, color):
+        key = (size, color)
+        image = self._image_cache.get(key)
+        if image is None:
+            image = pg.Surface((size, size), pg.SRCALPHA)
+            rect = image.get_rect()
+            pg.draw.circle(image, color, rect.center, size // 2)
+            image = image.convert_alpha()
+            self._image_cache[key] = image
+        return image
+
+    def clear(self):
+        self.alive[:] = False
+        self._prev_bound = None
+
+    def emit(self, explosion):
+        free = np.flatnonzero(~self.alive)[:explosion.nsparks]
+        n = len(free)
+        angles = np.random.uniform(0, math.tau, n)
+        minspeed, maxspeed = explosion.speeds
+        speeds = np.random.uniform(minspeed, maxspeed, n)
+        sizes = np.random.randint(1, 3, n)
+        self.x[free], self.y[free] = explosion.center
+        self.dx[free] = np.cos(angles) * speeds
+        self.dy[free] = np.sin(-angles) * speeds
+        self.alive[free] = True
+        for i, size in zip(free.tolist(), sizes.tolist()):
+            self.images[i] = self._image(size, explosion.color)
+
+    def update(self, bounds):
+        if not self.alive.any():
+            return
+        alive = self.alive
+        self.x[alive] += self.dx[alive]
+        self.y[alive] += self.dy[alive]
+        # sparks die as soon as they leave bounds
+        self.alive &= ((self.x >= bounds.left) & (self.x < bounds.right)
+                       & (self.y >= bounds.top) & (self.y < bounds.bottom))
+
+    def take_bound(self):
+        "Hand off the bounding rect of the last draw for erasure."
+        bound, self._prev_bound = self._prev_bound, None
+        return bound
+
+    def draw(self, surf):
+        dirty = []
+        indexes = np.flatnonzero(self.alive)
+        if len(indexes):
+            xs = self.x[indexes]
+            ys = self.y[indexes]
+            images = self.images
+            blits = []
+            for i, x, y in zip(indexes.tolist(), xs.tolist(), ys.tolist()):
+                image = images[i]
+                blits.append((image, (x - image.get_width() // 2,
+                                      y - image.get_height() // 2)))
+            surf.fblits(blits)
+            bound = pg.Rect(int(xs.min()) - 2, int(ys.min()) - 2,
+                            int(xs.max() - xs.min()) + 4,
+                            int(ys.max() - ys.min()) + 4)
+            self._prev_bound = bound.clip(surf.get_rect())
+            dirty.append(self._prev_bound)
+        return dirty
 
 
 class Explosion:
+    "Pending burst of sparks."
 
     def __init__(self, center, nsparks, color, speeds=None):
         self.center = center
-        sizes = [(s,s) for s in range(1,3)]
-        angles = range(360)
+        self.nsparks = nsparks
+        self.color = color
         if speeds is None:
             speeds = (10, 20)
-        minspeed, maxspeed = speeds
-        def randomspark_args():
-            return (random.choice(sizes), self.center,
-                    math.radians(random.choice(angles)),
-                    random.uniform(minspeed, maxspeed), color)
-        sparkargs = set(randomspark_args() for _ in range(nsparks))
-        sprites = (Spark(*args) for args in sparkargs)
-        self.sparks = pg.sprite.Group(*sprites)
+        self.speeds = speeds
 
 
-class EnemyShipSprite(pg.sprite.Sprite):
+class EnemyShipSprite(pg.sprite.DirtySprite):
 
     def __init__(self, textsprite, size, *groups):
         super().__init__(*groups)
+        self.dirty = 2
         self.textsprite = textsprite
         self._angle = 180
         self._image = pg.Surface(size, pg.SRCALPHA)
@@ -771,9 +1034,11 @@ class EnemyShipSprite(pg.sprite.Sprite):
             (rect.left, random.randint(rect.top, rect.bottom))
         ]
         pg.draw.polygon(self._image, (200,150,10), points)
-        self.update_image()
-        self.rect = self.image.get_rect()
+        self._rotations = rotation_atlas(self._image)
+        self._last_angle = None
+        self.rect = self._image.get_rect()
         self._position = self.rect.center
+        self.update_image()
 
     @property
     def angle(self):
@@ -793,33 +1058,62 @@ class EnemyShipSprite(pg.sprite.Sprite):
         self.rect.center = self._position = value
 
     def update_image(self):
-        self.image = pg.transform.rotate(self._image, self._angle)
+        angle = int(self._angle) % 360
+        if angle != self._last_angle:
+            self._last_angle = angle
+            self.image = self._rotations[angle]
+            # rotated frames outgrow the base image, keep rect bounding
+            self.rect = self.image.get_rect(center=self._position)
 
 
-class TextSprite(pg.sprite.Sprite):
+class TextSprite(pg.sprite.DirtySprite):
 
     def __init__(self, text, color, font, background, *groups, padding=(20, 10)):
         super().__init__(*groups)
+        # textsprites follow their enemy ship every frame
+        self.dirty = 2
         self._text = text
         self._color = color
         self._font = font
         self._background = background
         self._padding = padding
-        textrect = pg.Rect((0,0), self._font.size(self._text))
-        self._image = pg.Surface(textrect.inflate(*self._padding).size, pg.SRCALPHA)
+        self._suspend_update = False
+        self._last_render_key = None
+        textrect = pg.Rect((0,0), self._font.get_rect(self._text).size)
+        self._image = pg.Surface(textrect.inflate(*self._padding).size,
+                                 pg.SRCALPHA).convert_alpha()
         self.rect = self._image.get_rect()
         self.position = self.rect.center
         self._update_image()
         self.enemyshipsprite = EnemyShipSprite(self, (32,32))
 
+    @contextlib.contextmanager
+    def batch(self):
+        "Defer image updates while several properties are mutated."
+        self._suspend_update = True
+        try:
+            yield self
+        finally:
+            self._suspend_update = False
+            self._update_image()
+
     def _update_image(self):
-        textimage = self._font.render(self._text, True, self._color)
+        if self._suspend_update:
+            return
+        key = (self._text, self._color, self._background, self._padding,
+               id(self._font))
+        if key == self._last_render_key:
+            return
+        self._last_render_key = key
+        textimage = render_text(self._font, self._text, self._color)
         self._image.fill(self._background)
         px, py = self._padding
         rect = self._image.get_rect()
         pos = textimage.get_rect(right=rect.right-px//2, top=rect.top+py//2)
         self._image.blit(textimage, pos)
         self.image = self._image
+        if self.dirty < 2:
+            self.dirty = 1
 
     @property
     def text(self):
@@ -867,21 +1161,68 @@ class TextSprite(pg.sprite.Sprite):
         self._update_image()
 
 
+class HealthPipSprite(pg.sprite.DirtySprite):
+    "One block of the player's health bar."
+
+    _image = None
+
+    def __init__(self, index, bottom, *groups):
+        super().__init__(*groups)
+        self.image = self.pip_image()
+        self.rect = self.image.get_rect()
+        self.rect.x = int(10 + self.rect.width * index * 1.5)
+        self.rect.bottom = bottom
+
+    @classmethod
+    def pip_image(cls):
+        # every pip is identical, render it once for all sprites
+        if cls._image is None:
+            cls._image = pg.Surface((20,20)).convert()
+            cls._image.fill((200,10,10))
+        return cls._image
+
+
+class NullDebugRenderer:
+    "No-op renderer so the engine's per-frame call is unconditional."
+
+    __slots__ = ()
+
+    # nothing is drawn, dirty-rect display updates remain valid
+    forces_flip = False
+
+    def __call__(self):
+        # still responsible for emptying the debugging stack
+        debugstack.clear()
+
+    def take_rects(self):
+        return ()
+
+
+_null_debug_renderer = NullDebugRenderer()
+
+
 class DebugRenderer:
 
+    # debug text can land anywhere, force a full flip
+    forces_flip = True
+
     def __init__(self, screen):
         self.screen = screen
-        self.font = pg.font.Font(None, 24)
+        self.font = pg.freetype.Font(None, 24)
+        self.font.pad = True
         self.initial_previous = rectat(self.screen.rect, bottom=self.screen.rect.top)
+        self._drawn = []
 
     def __call__(self):
         prev = self.initial_previous
         while debugstack:
             value = debugstack.pop()
             if isinstance(value, str):
-                image = self.font.render(value, True, (200,10,10))
+                image, _ = self.font.render(value, (200,10,10))
+                image = image.convert_alpha()
                 prev = image.get_rect(topright = prev.bottomright)
                 self.screen.surf.blit(image, prev)
+                self._drawn.append(prev)
             else:
                 try:
                     func, *args = value
@@ -890,36 +1231,79 @@ class DebugRenderer:
                 else:
                     if callable(func):
                         func(self.screen.surf, *args)
+                        # no way to know what it painted
+                        self._drawn.append(self.screen.rect)
 
+    def take_rects(self):
+        "Hand off last frame's overlay rects for erasure."
+        rects, self._drawn = self._drawn, []
+        return rects
+
+
+Level = collections.namedtuple('Level', ['size', 'bucket'])
+
+_font = None
+
+def default_font():
+    "Lazily create the shared UI font once per process."
+    global _font
+    if _font is None:
+        pg.freetype.init()
+        _font = pg.freetype.Font(None, 32)
+        # pad renders to full line metrics so glyphs compose on a baseline
+        _font.pad = True
+    return _font
+
+@functools.lru_cache(maxsize=None)
+def load_words(path='words.txt'):
+    with open(path) as words_f:
+        return words_f.read().splitlines()
+
+@functools.lru_cache(maxsize=None)
+def load_levels(path='words.txt'):
+    """
+    Level(size, bucket) records per difficulty. Words are pre-filtered
+    once into fixed-dtype numpy buckets so sampling never runs per-word
+    predicates.
+    """
+    # one pass collects the clean words and their lengths together
+    clean = []
+    lengths = []
+    for word in load_words(path):
+        if not haspunctuation(word):
+            clean.append(word)
+            lengths.append(len(word))
+    clean = np.array(clean)
+    lens = np.array(lengths)
+    lt5 = lens < 5
+    return [Level(5, clean[(lens > 1) & lt5]),
+            Level(10, clean[(lens > 2) & lt5]),
+            Level(15, clean[(lens > 3) & lt5]),
+            Level(20, clean[lens > 4]),
+            Level(20, clean[lens > 7])]
 
 def start(debug=False, skip_mainmenu=False, skip_intro=False):
     "Setup and start the game"
-    with open('words.txt') as words_f:
-        words = words_f.read().splitlines()
-    wordbag = Wordbag(words)
-    npass, nfail = pg.init()
-    if nfail:
-        print(f'pass: {npass}, fail: {nfail}')
+    wordbag = Wordbag(load_words())
+    # init only the subsystems in use; pg.init() would also bring up the
+    # mixer, joystick, etc. (freetype comes up lazily in default_font)
+    pg.display.init()
     clock = Clock(60)
     screen = Screen((500, 900))
     state_manager = StateManager()
-    font = pg.font.Font(None, 32)
-    font_height = font.get_height()
-    spawn_area = screen.rect.copy()
-    spawn_area.width *= 1.25
-    spawn_area.height = font_height * 2
-    spawn_area.centerx = screen.rect.centerx
-    spawn_area.bottom = screen.rect.top
-    # (sample size, predicate)
-    levels = [(5, lambda word: not haspunctuation(word) and 1 < len(word) < 5),
-              (10, lambda word: not haspunctuation(word) and 2 < len(word) < 5),
-              (15, lambda word: not haspunctuation(word) and 3 < len(word) < 5),
-              (20, lambda word: not haspunctuation(word) and len(word) > 4),
-              (20, lambda word: not haspunctuation(word) and len(word) > 7)]
+    font = default_font()
+    font_height = font.get_sized_height()
+    # strip of integer dimensions just above the screen, 25% wider than it
+    screen_width = screen.rect.width
+    spawn_width = screen_width * 5 // 4
+    spawn_height = font_height * 2
+    spawn_area = pg.Rect((screen_width - spawn_width) // 2, -spawn_height,
+                         spawn_width, spawn_height)
+    levels = load_levels()
     gameplay = Gameplay(screen.rect, spawn_area, wordbag, font, levels, skip_intro=skip_intro)
     mainmenu = MenuState(screen.rect, font,
                          (Label('PyType'),
-                          Button('Play', lambda: pushstate(gameplay)),
+                          Button('Play', functools.partial(pushstate, gameplay)),
                           Button('Exit to desktop', popstate)))
     if debug:
         debug_renderer = DebugRenderer(screen)
@@ -932,14 +1316,34 @@ def start(debug=False, skip_mainmenu=False, skip_intro=False):
         pushstate(mainmenu)
     engine.run()
 
+USAGE = """\
+usage: pytype.py [-h] [--debug] [--skip-mainmenu] [--skip-intro]
+
+Typing game inspired by ZType
+
+options:
+  -h, --help       show this help message and exit
+  --debug          Show debugging info on screen.
+  --skip-mainmenu
+  --skip-intro
+"""
+
 def main(argv=None):
     "Typing game inspired by ZType"
-    parser = argparse.ArgumentParser(description=main.__doc__)
-    parser.add_argument('--debug', action='store_true', help='Show debugging info on screen.')
-    parser.add_argument('--skip-mainmenu', action='store_true')
-    parser.add_argument('--skip-intro', action='store_true')
-    args = parser.parse_args(argv)
-    start(debug=args.debug, skip_mainmenu=args.skip_mainmenu, skip_intro=args.skip_intro)
+    # only three boolean flags, not worth argparse's import and startup cost
+    if argv is None:
+        argv = sys.argv[1:]
+    flags = set(argv)
+    if flags & {'-h', '--help'}:
+        print(USAGE)
+        return
+    unknown = flags - {'--debug', '--skip-mainmenu', '--skip-intro'}
+    if unknown:
+        print(USAGE)
+        raise SystemExit(2)
+    start(debug='--debug' in flags,
+          skip_mainmenu='--skip-mainmenu' in flags,
+          skip_intro='--skip-intro' in flags)
 
 if __name__ == '__main__':
     main()